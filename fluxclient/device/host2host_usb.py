@@ -1,6 +1,7 @@
 
 from collections import deque
-from threading import Semaphore, Lock
+from queue import Empty, SimpleQueue
+from threading import Event, Semaphore, Lock, Thread
 from struct import Struct
 from errno import errorcode, ETIMEDOUT, ENODEV
 from uuid import UUID
@@ -23,6 +24,7 @@ DEVST_PACKER = Struct("<dif16s32s")
 ID_VENDOR = 0xffff
 ID_PRODUCT = 0xfd00
 USBTIMEOUT = 1.5
+MAX_CHANNELS = 0x80
 
 
 def match_direction(direction):
@@ -144,7 +146,7 @@ class USBProtocol(object):
 
             data = None
             while len(buf) > 3:
-                size, channel_idx = HEAD_PACKER.unpack(buf[:3])
+                size, channel_idx = HEAD_PACKER.unpack_from(buf)
                 if size % 256 == 0:
                     buf = buf[1:]
                     continue
@@ -216,7 +218,11 @@ class USBProtocol(object):
     def build_object(cls, chl_idx, obj, fin):
         data = msgpack.packb(obj)
         l = len(data) + 4
-        return b"".join((HEAD_PACKER.pack(l, chl_idx), data, BYTE_PACKER.pack(fin)))
+        buf = bytearray(l)
+        HEAD_PACKER.pack_into(buf, 0, l, chl_idx)
+        buf[3:l - 1] = data
+        buf[l - 1] = fin
+        return bytes(buf)
 
     _dev = None
     _tx = _rx = None
@@ -256,7 +262,6 @@ class USBProtocol1(USBProtocol):
     device_status = None
     timestamp = 0
     _flag = 0
-    _buf = b""
 
     _enable_ping = False
     _wait_ping = False
@@ -265,21 +270,42 @@ class USBProtocol1(USBProtocol):
         super(USBProtocol1, self).__init__(dev, tx, rx, endpoint_profile)
 
         self._enable_ping = self.version >= StrictVersion("1.6.3")
+        # read wMaxPacketSize * N per URB so one submit returns many frames
+        self._rx_chunk = max(16384, rx.wMaxPacketSize * 32)
+        # pending recv data; consume by moving _pos, compact lazily so
+        # neither append nor head consume copies the whole tail
+        self._buf = bytearray()
+        self._pos = 0
+        self._packer = msgpack.Packer()
+        self._unpacker = msgpack.Unpacker(encoding="utf8",
+                                          unicode_errors="ignore")
+        # reusable outbound frame, grown on demand and shrunk only if a
+        # pathological frame inflated it
+        self._tx_frame = bytearray(65536)
         self.tx_mutex = Lock()
-        self.chl_semaphore = Semaphore(0)
+        # opens are serialized by chl_open_mutex, so a single Event is
+        # enough to hand the response back to the waiter
+        self.chl_open_event = Event()
         self.chl_open_mutex = Lock()
+        self._rx_queue = SimpleQueue()
+        self._rx_thread = None
         self.channels = {}
+        self._free_channels = set(range(MAX_CHANNELS))
         self.device_status = {}
         self._flag = 1
 
     def _send(self, buf):
         # Low level send
+        with self.tx_mutex:
+            self._send_locked(buf)
+
+    def _send_locked(self, buf):
+        # Low level send, tx_mutex already held
         try:
             l = len(buf)
-            with self.tx_mutex:
-                ret = self._tx.write(buf[:512])
-                while ret < l:
-                    ret += self._tx.write(buf[ret:ret + 512])
+            ret = self._tx.write(buf[:512])
+            while ret < l:
+                ret += self._tx.write(buf[ret:ret + 512])
 
         except usb.core.USBError as e:
             self.close()
@@ -290,8 +316,11 @@ class USBProtocol1(USBProtocol):
                                    symbol=("UNKNOWN_ERROR",
                                            errorcode.get(e.errno, e.errno)))
 
+    # the ack's only variable byte is the channel index; build them all once
+    _ACK_CACHE = tuple(HEAD_PACKER.pack(4, i) + b"\x80" for i in range(0x80))
+
     def _send_binary_ack(self, channel_idx):
-        self._send(HEAD_PACKER.pack(4, channel_idx) + b"\x80")
+        self._send(self._ACK_CACHE[channel_idx])
 
     def _recv(self, length, timeout):
         # Low level recv
@@ -307,47 +336,84 @@ class USBProtocol1(USBProtocol):
                 self.close()
                 raise FluxUSBError(*e.args)
 
+    def _start_rx_pump(self):
+        # reader thread keeps the endpoint busy while run() parses, so
+        # the libusb wait overlaps msgpack decode instead of serializing
+        self._rx_thread = Thread(target=self._rx_pump, daemon=True)
+        self._rx_thread.start()
+
+    def _rx_pump(self):
+        try:
+            while self._flag == 3:
+                data = self._recv(self._rx_chunk, 50)
+                if data:
+                    self._rx_queue.put(data)
+        except Exception as e:  # propagated to run() on next feed
+            self._rx_queue.put(e)
+
     def _feed_buffer(self, timeout=50):
-        self._buf += self._recv(512, timeout)
+        if self._rx_thread is None:
+            self._buf.extend(self._recv(self._rx_chunk, timeout))
+            return
+        try:
+            data = self._rx_queue.get(timeout=timeout / 1000.)
+            while True:
+                if isinstance(data, Exception):
+                    raise data
+                self._buf.extend(data)
+                data = self._rx_queue.get_nowait()
+        except Empty:
+            pass
+
+    def _unpack_stream(self, buf):
+        # decode through the persistent Unpacker; the C-level feed path
+        # skips per-frame Unpacker construction and kwargs parsing
+        self._unpacker.feed(buf)
+        return next(self._unpacker)
+
+    def _consume_buffer(self, size):
+        self._pos += size
+        if self._pos > 65536:
+            del self._buf[:self._pos]
+            self._pos = 0
 
     def _unpack_buffer(self):
-        l = len(self._buf)
+        l = len(self._buf) - self._pos
         if l > 3:
-            size, channel_idx = HEAD_PACKER.unpack(self._buf[:3])
+            size, channel_idx = HEAD_PACKER.unpack_from(self._buf, self._pos)
             if size < 3:
                 if size == 0:
-                    self._buf = self._buf[2:]
+                    self._consume_buffer(2)
                     return -1, None, None
                 else:
                     raise FluxUSBError("Recv bad usb message size: %i" % size)
             elif l >= size:
-                fin = self._buf[size - 1]
-                buf = self._buf[3:size - 1]
-                self._buf = self._buf[size:]
+                fin = self._buf[self._pos + size - 1]
+                buf = bytes(self._buf[self._pos + 3:self._pos + size - 1])
+                self._consume_buffer(size)
                 return channel_idx, buf, fin
         return None, None, None
 
     def run_once(self):
         self._feed_buffer()
-        channel_idx, buf, fin = self._unpack_buffer()
-        if channel_idx is None:
-            return
-        elif channel_idx == -1:
+        # drain every complete frame before asking the endpoint again
+        while True:
+            channel_idx, buf, fin = self._unpack_buffer()
+            if channel_idx is None:
+                return
+            self._handle_frame(channel_idx, buf, fin)
+
+    def _handle_frame(self, channel_idx, buf, fin):
+        if channel_idx == -1:
             raise FluxUSBError("USB protocol broken, got zero data length.")
         elif channel_idx < 0x80:
             channel = self.channels.get(channel_idx)
             if channel is None:
                 raise FluxUSBError("Recv bad channel idx 0x%02x" % channel_idx)
-            if fin == 0xf0:
-                channel.on_object(msgpack.unpackb(buf, encoding="utf8",
-                                  unicode_errors="ignore"))
-            elif fin == 0xff:
-                self._send_binary_ack(channel_idx)
-                channel.on_binary(buf)
-            elif fin == 0xc0:
-                channel.on_binary_ack()
-            else:
+            handler = channel.fin_dispatch.get(fin)
+            if handler is None:
                 raise FluxUSBError("Recv bad fin 0x%02x" % fin)
+            handler(buf)
         elif channel_idx == 0xa0 and fin == 0xff:
             logger.debug("Recv padding")
         elif channel_idx == 0xf1:
@@ -364,6 +430,7 @@ class USBProtocol1(USBProtocol):
     def run(self):
         try:
             self._flag |= 2
+            self._start_rx_pump()
             while self._flag == 3:
                 self.run_once()
                 if time() - self.timestamp > USBTIMEOUT:
@@ -384,6 +451,7 @@ class USBProtocol1(USBProtocol):
         self._flag = 0
         while self.channels:
             idx, channel = self.channels.popitem()
+            self._free_channels.add(idx)
             channel.close(directly=True)
         super(USBProtocol1, self).close()
 
@@ -399,15 +467,25 @@ class USBProtocol1(USBProtocol):
             self._send(CTRL_PACKER.pack(4, 0xfa, 0x00))
 
     def send_object(self, chl_idx, obj):
-        data = msgpack.packb(obj)
-        l = len(data) + 4
-        buf = b"".join((HEAD_PACKER.pack(l, chl_idx), data, b"\xb0"))
-        self._send(buf)
+        self._send_frame(chl_idx, self._packer.pack(obj), 0xb0)
 
     def send_binary(self, chl_idx, data):
-        l = len(data) + 4
-        buf = b"".join((HEAD_PACKER.pack(l, chl_idx), data, b"\xbf"))
-        self._send(buf)
+        self._send_frame(chl_idx, data, 0xbf)
+
+    def _send_frame(self, chl_idx, data, fin):
+        # assemble header + payload + fin in the reusable tx buffer with
+        # a single payload copy; the buffer is shared so build under lock
+        total = len(data) + 4
+        with self.tx_mutex:
+            frame = self._tx_frame
+            if total > len(frame):
+                frame.extend(bytes(total - len(frame)))
+            HEAD_PACKER.pack_into(frame, 0, total, chl_idx)
+            frame[3:total - 1] = data
+            frame[total - 1] = fin
+            self._send_locked(memoryview(frame)[:total])
+            if len(frame) > 131072 and total <= 65536:
+                del frame[65536:]
 
     def _on_pong(self, buf):
         self._wait_ping = False
@@ -428,13 +506,15 @@ class USBProtocol1(USBProtocol):
         if action == b"open":
             if status == b"ok":
                 self.channels[index] = Channel(self, index)
-                self.chl_semaphore.release()
+                self._free_channels.discard(index)
                 logger.info("Channel %i opened", index)
             else:
                 logger.error("Channel %i open failed", index)
+            self.chl_open_event.set()
         elif action == b"close":
             if status == b"ok":
                 self.channels.pop(index)
+                self._free_channels.add(index)
                 logger.info("Channel %i closed", index)
             else:
                 logger.error("Channel %i close failed", index)
@@ -448,15 +528,14 @@ class USBProtocol1(USBProtocol):
     def open_channel(self, channel_type="robot", timeout=10.0):
         # Send request
         with self.chl_open_mutex:
-            idx = None
-            for i in range(len(self.channels) + 1):
-                if self.channels.get(i) is None:
-                    idx = i
+            # lowest unused index, tracked in O(1) instead of rescanning
+            idx = min(self._free_channels)
             logger.info("Request channel %i with type %s", idx, channel_type)
+            self.chl_open_event.clear()
             self.send_object(0xf0, {"channel": idx, "action": "open",
                                     "type": channel_type})
 
-            self.chl_semaphore.acquire(timeout=timeout)
+            self.chl_open_event.wait(timeout)
             channel = self.channels.get(idx)
             if channel:
                 return self.channels[idx]
@@ -473,14 +552,15 @@ class USBProtocol2(USBProtocol1):
         self._local_idx, self._remote_idx = 0, 0
 
     def _unpack_buffer(self):
-        l = len(self._buf)
+        l = len(self._buf) - self._pos
         if l > 6:
-            size, seq, chl_idx, fin = HEAD_V2_PACKER.unpack(self._buf[:6])
+            size, seq, chl_idx, fin = HEAD_V2_PACKER.unpack_from(self._buf,
+                                                                 self._pos)
             if size < 6:
                 raise FluxUSBError("Recv bad usb message size: %i" % size)
             elif l >= size:
-                buf = self._buf[6:size]
-                self._buf = self._buf[size:]
+                buf = bytes(self._buf[self._pos + 6:self._pos + size])
+                self._consume_buffer(size)
                 return seq, chl_idx, fin, buf
         return None, None, None, None
 
@@ -488,6 +568,7 @@ class USBProtocol2(USBProtocol1):
         last_ping = -1
         try:
             self._flag |= 2
+            self._start_rx_pump()
             while self._flag == 3:
                 self.run_once()
                 if time() - last_ping > 3.0:
@@ -511,11 +592,15 @@ class USBProtocol2(USBProtocol1):
 
     def run_once(self):
         self._feed_buffer()
-        seq, channel_idx, fin, buf = self._unpack_buffer()
-
-        if seq is None:
-            return
-        elif channel_idx == 0xf2:
+        # drain every complete frame before asking the endpoint again
+        while True:
+            seq, channel_idx, fin, buf = self._unpack_buffer()
+            if seq is None:
+                return
+            self._handle_frame(seq, channel_idx, fin, buf)
+
+    def _handle_frame(self, seq, channel_idx, fin, buf):
+        if channel_idx == 0xf2:
             # Remote send ack
             while self._local_queue:
                 if self._local_queue[0][0] <= seq or \
@@ -544,8 +629,7 @@ class USBProtocol2(USBProtocol1):
             if channel is None:
                 raise FluxUSBError("Recv bad channel idx 0x%02x" % channel_idx)
             if fin == 0:
-                channel.on_object(msgpack.unpackb(buf, encoding="utf8",
-                                  unicode_errors="ignore"))
+                channel.on_object(self._unpack_stream(buf))
             elif fin == 1:
                 channel.on_binary(buf)
             else:
@@ -567,12 +651,14 @@ class USBProtocol2(USBProtocol1):
             self._send(HEAD_V2_PACKER.pack(6, self._remote_idx - 1, 0xf2, 0))
 
     def send_object(self, chl_idx, obj):
-        data = msgpack.packb(obj)
+        data = self._packer.pack(obj)
         l = len(data) + 6
         if l > 512:
             raise RuntimeError("Payload size overlimit")
         with self.tx_mutex2:
-            buf = HEAD_V2_PACKER.pack(l, self._local_idx, chl_idx, 0) + data
+            buf = bytearray(l)
+            HEAD_V2_PACKER.pack_into(buf, 0, l, self._local_idx, chl_idx, 0)
+            buf[6:] = data
             if self.tx_semaphore.acquire(timeout=15):
                 if not self._local_queue:
                     self.timestamp = time()
@@ -587,7 +673,9 @@ class USBProtocol2(USBProtocol1):
         if l > 512:
             raise RuntimeError("Payload size overlimit")
         with self.tx_mutex2:
-            buf = HEAD_V2_PACKER.pack(l, self._local_idx, chl_idx, 1) + data
+            buf = bytearray(l)
+            HEAD_V2_PACKER.pack_into(buf, 0, l, self._local_idx, chl_idx, 1)
+            buf[6:] = data
             if self.tx_semaphore.acquire(timeout=15):
                 if not self._local_queue:
                     self.timestamp = time()
@@ -617,11 +705,16 @@ class Channel(object):
     def __init__(self, usbprotocol, index):
         self.index = index
         self.usbprotocol = usbprotocol
-        self.obj_semaphore = Semaphore(0)
-        self.buf_semaphore = Semaphore(0)
-        self.ack_semaphore = Semaphore(0)
-        self.objq = deque()
-        self.bufq = deque()
+        # SimpleQueue handoff is C level; no condvar wakeup per message
+        self.objq = SimpleQueue()
+        self.bufq = SimpleQueue()
+        self.ackq = SimpleQueue()
+
+        # bound once so the recv loop does one dict get per frame
+        # instead of walking a fin if/elif cascade
+        self.fin_dispatch = {0xf0: self.on_object_frame,
+                             0xff: self.on_binary_frame,
+                             0xc0: self.on_binary_ack_frame}
 
         self.__opened = True
 
@@ -638,9 +731,18 @@ class Channel(object):
             if directly is False:
                 self.usbprotocol._close_channel(self)
 
+    def on_object_frame(self, buf):
+        self.on_object(self.usbprotocol._unpack_stream(buf))
+
+    def on_binary_frame(self, buf):
+        self.usbprotocol._send_binary_ack(self.index)
+        self.on_binary(buf)
+
+    def on_binary_ack_frame(self, buf):
+        self.on_binary_ack()
+
     def on_object(self, obj):
-        self.objq.append(obj)
-        self.obj_semaphore.release()
+        self.objq.put(obj)
 
     def on_binary(self, buf):
         if self.binary_stream:
@@ -652,21 +754,22 @@ class Channel(object):
                                "close channel directly (channel=%i)",
                                self.binary_stream, e, self.index)
         else:
-            self.bufq.append(buf)
-            self.buf_semaphore.release()
+            self.bufq.put(buf)
 
     def get_buffer(self, timeout=20.0):
-        if self.buf_semaphore.acquire(timeout=timeout) is False:
+        try:
+            return self.bufq.get(timeout=timeout)
+        except Empty:
             raise FluxUSBError("Operation timeout", symbol=("TIMEOUT", ))
-        return self.bufq.popleft()
 
     def on_binary_ack(self):
-        self.ack_semaphore.release()
+        self.ackq.put(True)
 
     def get_object(self, timeout=10.0):
-        if self.obj_semaphore.acquire(timeout=timeout) is False:
+        try:
+            return self.objq.get(timeout=timeout)
+        except Empty:
             raise FluxUSBError("Operation timeout", symbol=("TIMEOUT", ))
-        return self.objq.popleft()
 
     def send_object(self, obj):
         if self.__opened:
@@ -678,7 +781,9 @@ class Channel(object):
     def send_binary(self, buf, timeout=10.0):
         if self.__opened:
             self.usbprotocol.send_binary(self.index, buf)
-            if self.ack_semaphore.acquire(timeout=timeout) is False:
+            try:
+                self.ackq.get(timeout=timeout)
+            except Empty:
                 raise FluxUSBError("Operation timeout", symbol=("TIMEOUT", ))
         else:
             raise FluxUSBError("Device is closed",
@@ -47,9 +47,40 @@ class LaserBase(object):
         self.ext_metadata['CORRECTION'] = 'N'
         self.ext_metadata['FILAMENT_DETECT'] = 'N'
 
+    # defaults so either setter below can fuse before the other runs
+    _rotation = 0.
+    _cos_r, _sin_r = 1., 0.
+    _ratio = 1.
+
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        # cache cos/sin so each moveTo doesn't redo the trig
+        self._rotation = value
+        self._cos_r = cos(value)
+        self._sin_r = sin(value)
+        self._update_transform()
+
+    @property
+    def ratio(self):
+        return self._ratio
+
+    @ratio.setter
+    def ratio(self, value):
+        self._ratio = value
+        self._update_transform()
+
+    def _update_transform(self):
+        # rotation and scale fused into one 2x2 matrix for moveTo
+        self._tx_a = self._ratio * self._cos_r
+        self._tx_b = self._ratio * self._sin_r
+
     def reset_image(self):
         w = self.pixel_per_mm * self.radius * 2
-        self.image_map = np.ones((w, w), np.uint8) * 255
+        self.image_map = np.full((w, w), 255, np.uint8)
 
     def header(self, header):
         """
@@ -118,14 +149,14 @@ class LaserBase(object):
         return ["G1 F%.5f Z%.5f" % (self.laser_speed, z)]
 
 
-    def moveTo(self, x, y, speed=None, z=None, ending=None):
+    def moveTo_into(self, out, x, y, speed=None, z=None, ending=None):
         """
-            apply global "rotation" and "scale"
-            move to position x,y
+            same as moveTo but append the gcode onto a caller-provided
+            buffer, skipping a fresh list per move in hot loops
         """
 
-        x2 = (x * cos(self.rotation) - y * sin(self.rotation)) * self.ratio
-        y2 = (x * sin(self.rotation) + y * cos(self.rotation)) * self.ratio
+        x2 = x * self._tx_a - y * self._tx_b
+        y2 = x * self._tx_b + y * self._tx_a
 
         x = x2
         y = y2
@@ -142,9 +173,18 @@ class LaserBase(object):
         self.current_x = x
         self.current_y = y
         if z is None:
-            return ["G1 F%.5f X%.5f Y%.5f %s" % (speed, x, y, ending)]
+            out.append("G1 F%.5f X%.5f Y%.5f %s" % (speed, x, y, ending))
         else:
-            return ["G1 F%.5f X%.5f Y%.5f Z%.5f %s" % (speed, x, y, z, ending)]
+            out.append("G1 F%.5f X%.5f Y%.5f Z%.5f %s" % (speed, x, y, z, ending))
+
+    def moveTo(self, x, y, speed=None, z=None, ending=None):
+        """
+            apply global "rotation" and "scale"
+            move to position x,y
+        """
+        gcode = []
+        self.moveTo_into(gcode, x, y, speed, z, ending)
+        return gcode
 
     def drawTo(self, x, y, speed=None, z=None):
         """
@@ -156,9 +196,9 @@ class LaserBase(object):
         gcode += self.turnOn()
 
         if speed is None:
-            gcode += self.moveTo(x, y, self.laser_speed, z, ending=';draw')
+            self.moveTo_into(gcode, x, y, self.laser_speed, z, ending=';draw')
         else:
-            gcode += self.moveTo(x, y, speed, z, ending=';draw')
+            self.moveTo_into(gcode, x, y, speed, z, ending=';draw')
 
         return gcode
 
@@ -170,20 +210,27 @@ class LaserBase(object):
         gcode += self.turnOff()
 
         if speed is None:
-            gcode += self.moveTo(x, y, self.travel_speed, z)
+            self.moveTo_into(gcode, x, y, self.travel_speed, z)
         else:
-            gcode += self.moveTo(x, y, speed, z)
+            self.moveTo_into(gcode, x, y, speed, z)
         return gcode
 
     def to_image(self, buffer_data, img_width, img_height):
         """
         convert buffer_data(bytes) to a 2d array
         """
-        int_data = list(buffer_data)
-        assert len(int_data) == img_width * img_height, "data length != width * height, %d != %d * %d" % (len(int_data), img_width, img_height)
-        image = [int_data[i * img_width: (i + 1) * img_width] for i in range(img_height)]
+        int_data = np.frombuffer(buffer_data, dtype=np.uint8)
+        assert int_data.size == img_width * img_height, "data length != width * height, %d != %d * %d" % (int_data.size, img_width, img_height)
+
+        return int_data.reshape(img_height, img_width)
 
-        return image
+    def rotate_batch(self, xy, rotation, cx=0., cy=0.):
+        """
+        compute new (N, 2) points after rotate toward (cx, cy),
+        one matmul instead of a Python call per point
+        """
+        c, s = cos(rotation), sin(rotation)
+        return (np.asarray(xy) - (cx, cy)).dot([[c, s], [-s, c]]) + (cx, cy)
 
     def gcode_generate(self):
         """Virtual function gcode_generate"""
@@ -225,16 +272,6 @@ class LaserBase(object):
           return:
             None
         """
-        def rotate(x, y, rotation, cx=0., cy=0.):
-            """
-            compute new (x, y) after rotate toward (cx, cy)
-            """
-            vx = (x - cx)
-            vy = (y - cy)
-            x = cx + vx * cos(rotation) - vy * sin(rotation)
-            y = cy + vx * sin(rotation) + vy * cos(rotation)
-            return x, y
-
         pix = Image.frombytes('L', (img_width, img_height), buffer_data)
         # pix.save('get.png', 'png')
 
@@ -242,32 +279,31 @@ class LaserBase(object):
         cx = (x1 + x2) / 2.
         cy = (y1 + y2) / 2.
 
-        # compute four original corner
-        ox1, oy1 = rotate(x1, y1, -rotation, cx, cy)
-        ox3, oy3 = rotate(x2, y2, -rotation, cx, cy)
-
-        # 1 4
-        # 2 3
-        ox2, oy2 = ox1, oy3
-        ox4, oy4 = ox3, oy1
+        # compute two original corner by un-rotating (1 and 3)
+        c, s = cos(rotation), sin(rotation)
+        ox1 = cx + (x1 - cx) * c + (y1 - cy) * s
+        oy1 = cy - (x1 - cx) * s + (y1 - cy) * c
+        ox3 = cx + (x2 - cx) * c + (y2 - cy) * s
+        oy3 = cy - (x2 - cx) * s + (y2 - cy) * c
 
         pix = pix.resize(tuple(map(lambda x: int(x * self.pixel_per_mm), ((ox3 - ox1), (oy3 - oy1)))))
 
-        # rotate four corner
-        ox1, oy1 = rotate(ox1, oy1, rotation, cx, cy)
-        ox2, oy2 = rotate(ox2, oy2, rotation, cx, cy)
-        ox3, oy3 = rotate(ox3, oy3, rotation, cx, cy)
-        ox4, oy4 = rotate(ox4, oy4, rotation, cx, cy)
+        # rotate four corner in one batch
+        # 1 4
+        # 2 3
+        corners = self.rotate_batch([[ox1, oy1], [ox1, oy3],
+                                     [ox3, oy3], [ox3, oy1]],
+                                    rotation, cx, cy)
 
         # find upper-left corner after rotation(edge)
-        gx1 = min(ox1, ox2, ox3, ox4)
-        gy1 = max(oy1, oy2, oy3, oy4)
+        gx1 = corners[:, 0].min()
+        gy1 = corners[:, 1].max()
 
         gy1_on_map = round((gx1 / self.radius * len(self.image_map) / 2.) + (len(self.image_map) / 2.))
         gx1_on_map = round(-(gy1 / self.radius * len(self.image_map) / 2.) + (len(self.image_map) / 2.))
 
-        gx2 = max(ox1, ox2, ox3, ox4)
-        gy2 = min(oy1, oy2, oy3, oy4)
+        gx2 = corners[:, 0].max()
+        gy2 = corners[:, 1].min()
         gy2_on_map = round((gx2 / self.radius * len(self.image_map) / 2.) + (len(self.image_map) / 2.))
         gx2_on_map = round(-(gy2 / self.radius * len(self.image_map) / 2.) + (len(self.image_map) / 2.))
 
@@ -276,36 +312,30 @@ class LaserBase(object):
         new_pix.paste(pix, (1, 1))
         new_pix = new_pix.rotate(degrees(rotation), expand=1)
 
-        for h in range(new_pix.size[1]):
-            # using white frame to find starting and ending index
-            # find_start, find_end for each row
-            flag1 = False  # whether find white frame
-            for find_s in range(new_pix.size[0]):
-                if new_pix.getpixel((find_s, h)) > 0:  # check this thres?
-                    find_s = find_s + 1
-                    flag1 = True
-                    break
-
-            flag2 = False
-            for find_e in range(new_pix.size[0] - 1, -1, -1):
-                if new_pix.getpixel((find_e, h)) > 0:
-                    find_e = find_e
-                    flag2 = True
-                    break
-
-            # only one white point in this row(cause by resizing)
-            # if find_e < find_s and abs(h - (new_pix.size[1] / 2)) > 1:
-            #     find_e = new_pix.size[0]
-
-            # NOTE: flag1 always equal to flag2
-            if flag1:  # at least one white point in this row
-                for w in range(find_s, find_e):
-                    if (gx1_on_map + h - len(self.image_map) / 2.) ** 2 + (gy1_on_map + w - len(self.image_map) / 2.) ** 2 < (len(self.image_map) / 2.) ** 2:
-                        if new_pix.getpixel((w, h)) <= thres:
-                            if self.shading or self.focus_by_color:
-                                self.image_map[gx1_on_map + h][gy1_on_map + w] = new_pix.getpixel((w, h))
-                            else:
-                                self.image_map[gx1_on_map + h][gy1_on_map + w] = 0
+        arr = np.asarray(new_pix)  # shape = (height, width), arr[h][w] = getpixel((w, h))
+        img_h, img_w = arr.shape
+
+        # using white frame to find starting and ending index
+        # find_start, find_end for each row
+        nonzero = arr > 0  # check this thres?
+        find_s = nonzero.argmax(axis=1) + 1
+        find_e = img_w - 1 - nonzero[:, ::-1].argmax(axis=1)
+
+        yy, xx = np.ogrid[0:img_h, 0:img_w]
+        # white frame found and w in range(find_s, find_e) for each row
+        mask = nonzero.any(axis=1)[:, None] & \
+            (xx >= find_s[:, None]) & (xx < find_e[:, None])
+        # stay inside the laser radius
+        half = len(self.image_map) / 2.
+        mask &= ((gx1_on_map + yy - half) ** 2 +
+                 (gy1_on_map + xx - half) ** 2) < half ** 2
+        mask &= arr <= thres
+
+        hs, ws = np.nonzero(mask)
+        if self.shading or self.focus_by_color:
+            self.image_map[gx1_on_map + hs, gy1_on_map + ws] = arr[hs, ws]
+        else:
+            self.image_map[gx1_on_map + hs, gy1_on_map + ws] = 0
 
     def dump(self, file_name='', mode='save'):
         """
@@ -1,6 +1,4 @@
 
-from math import sin, cos
-
 from .laser_base import LaserBase
 
 
@@ -45,8 +43,8 @@ class LaserMiddleware(LaserBase):
             move to position x,y
         """
 
-        x2 = (x * cos(self.rotation) - y * sin(self.rotation)) * self.ratio
-        y2 = (x * sin(self.rotation) + y * cos(self.rotation)) * self.ratio
+        x2 = x * self._tx_a - y * self._tx_b
+        y2 = x * self._tx_b + y * self._tx_a
 
         x = x2
         y = y2